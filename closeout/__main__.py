@@ -1,9 +1,9 @@
 import logging
 import os
-from typing import cast
+from typing import Optional, cast
 
-import afp.bindings
 from eth_account.account import Account
+from hexbytes import HexBytes
 from web3 import HTTPProvider, Web3
 from web3.middleware import Middleware, SignAndSendRawMiddlewareBuilder
 
@@ -13,7 +13,7 @@ from notifications.healthcheck import ping_healthcheck
 from notifications.utils import format_link
 from subquery.client import AutSubquery
 
-from .service import CloseoutService
+from .service import CloseoutService, ClosingProductContext
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -31,71 +31,109 @@ notifier = get_notifier()
 def main():
     logger.info("Starting closeout agent: connecting to RPC %s", RPC_URL)
     logger.info("Using Subquery endpoint: %s", SUBQUERY_URL)
-    sq = AutSubquery(url=SUBQUERY_URL)
-    w3 = Web3(HTTPProvider(RPC_URL))
+    # Cache immutable responses such as eth_chainId, which the signing middleware
+    # would otherwise request again for every transaction.
+    w3 = Web3(HTTPProvider(RPC_URL, cache_allowed_requests=True))
     signer = Account.from_key(PRIVATE_KEY)
     w3.eth.default_account = signer.address
     signing_middleware = SignAndSendRawMiddlewareBuilder.build(signer)
     w3.middleware_onion.add(cast(Middleware, signing_middleware))
 
-    service = CloseoutService(w3, sq)
-    products = service.closeable_products()
+    with AutSubquery(url=SUBQUERY_URL) as sq:
+        service = CloseoutService(w3, sq)
+        products = service.closeable_products()
 
-    logger.info("Found %d closeable products", len(products))
-    submitted_txs = []
-    for product in products:
-        logger.info("%s - processing closeout", product.product_id.to_0x_hex())
-        product.populate()
-        logger.info(
-            "%s - number of accounts %d",
-            product.product_id.to_0x_hex(),
-            len(product.accounts),
-        )
-        tx_hash = product.start_closeout()
-        logger.info(
-            "%s - closeout tx sent: %s", product.product_id.to_0x_hex(), tx_hash.hex()
-        )
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        logger.info(
-            "%s - closeout tx mined in block %d",
-            product.product_id.to_0x_hex(),
-            receipt.blockNumber,
-        )
-        open_interest = service.open_interest(product.product_id)
+        logger.info("Found %d closeable products", len(products))
+        # A product that fails its checks is left out, so that it does not block
+        # the closeout of the others; the first error is re-raised at the end.
+        error: Optional[Exception] = None
+        populated: list[ClosingProductContext] = []
+        for product in products:
+            logger.info("%s - processing closeout", product.product_id_hex)
+            try:
+                product.populate()
+            except Exception as e:
+                logger.error("%s - cannot close out: %s", product.product_id_hex, e)
+                error = error or e
+                continue
+            logger.info(
+                "%s - number of accounts %d",
+                product.product_id_hex,
+                len(product.accounts),
+            )
+            populated.append(product)
+
+    # Submit all closeout transactions before waiting for any receipt, so that
+    # they can be included in the same block instead of one block per product.
+    nonce = w3.eth.get_transaction_count(signer.address, "pending")
+    submitted: list[ClosingProductContext] = []
+    submitted_txs: list[HexBytes] = []
+    for product in populated:
+        try:
+            tx_hash = product.start_closeout(nonce)
+        except Exception as e:
+            logger.error("%s - closeout not sent: %s", product.product_id_hex, e)
+            error = error or e
+            continue
+        nonce += 1
+        logger.info("%s - closeout tx sent: %s", product.product_id_hex, tx_hash.hex())
+        submitted.append(product)
+        submitted_txs.append(tx_hash)
+
+    # A receipt that cannot be fetched does not stop the checks of the others;
+    # every submitted transaction is still notified below.
+    for product, tx_hash in zip(submitted, submitted_txs):
+        try:
+            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            logger.info(
+                "%s - closeout tx mined in block %d",
+                product.product_id_hex,
+                receipt.blockNumber,
+            )
+            open_interest = service.open_interest(product.product_id)
+        except Exception as e:
+            logger.error(
+                "%s - cannot confirm closeout tx %s: %s",
+                product.product_id_hex,
+                tx_hash.hex(),
+                e,
+            )
+            error = error or e
+            continue
         if open_interest > 0:
             logger.warning(
                 "%s - open interest after closeout not zero!: %d",
-                product.product_id,
+                product.product_id_hex,
                 open_interest,
             )
         else:
             logger.info(
                 "%s - open interest is zero after closeout: product closed out",
-                product.product_id.to_0x_hex(),
+                product.product_id_hex,
             )
-        submitted_txs.append(tx_hash)
 
-    if len(products) > 0:
-        clearing = afp.bindings.ClearingDiamond(w3)
+    if len(submitted) > 0:
         notify_data = [
             notifications.NotificationItem(
                 title=f"Product {product.symbol}",
                 values={
-                    "Product ID": product.product_id.to_0x_hex(),
-                    "FSP": f"{clearing.get_fsp(product.product_id)[0]}",
+                    "Product ID": product.product_id_hex,
+                    "FSP": f"{product.fsp}",
                     "Closeout Tx": format_link(
                         tx.to_0x_hex(), notifications.utils.LinkType.TX
                     ),
                 },
             )
-            for product, tx in zip(products, submitted_txs)
+            for product, tx in zip(submitted, submitted_txs)
         ]
         notifier.notify(
             "Products Closed Out",
-            f"Closeout submitted for {len(products)} products",
+            f"Closeout submitted for {len(submitted)} products",
             notify_data,
         )
-    logger.info("Closeout submitted for %d products", len(products))
+    logger.info("Closeout submitted for %d products", len(submitted))
+    if error is not None:
+        raise error
     ping_healthcheck()
 
 
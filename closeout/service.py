@@ -1,11 +1,17 @@
 import logging
-from typing import List
+from functools import cached_property
+from typing import List, Optional
 
 import afp.bindings
+from afp.constants import defaults
+from eth_typing import ChecksumAddress
 from hexbytes import HexBytes
 from web3 import Web3
+from web3.contract import Contract
+from web3.types import Nonce, TxParams
 
-from subquery.client import AccountInfo, AutSubquery
+from subquery.client import AccountInfo, AutSubquery, ProductInfo
+from utils import batch_call
 
 logger = logging.getLogger(__name__)
 
@@ -27,15 +33,23 @@ class ClosingProductContext:
         Web3 instance for contract interactions.
     product_id : HexBytes
         The product identifier.
+    symbol : str
+        The product symbol.
+    fsp : int
+        The finalized Final Settlement Price, as read during the product scan.
     accounts : list[AccountInfo]
         List of accounts with open positions in the product.
+    clearing : afp.bindings.ClearingDiamond
+        ClearingDiamond binding used to initiate the final settlement.
     """
 
     client: AutSubquery
     w3: Web3
     product_id: HexBytes
     symbol: str
+    fsp: int
     accounts: list[AccountInfo]
+    clearing: afp.bindings.ClearingDiamond
 
     def __init__(
         self,
@@ -43,18 +57,30 @@ class ClosingProductContext:
         client: AutSubquery,
         product_id: HexBytes,
         symbol: str = "",
+        fsp: int = 0,
+        clearing: Optional[afp.bindings.ClearingDiamond] = None,
     ):
         self.w3 = w3
         self.client = client
         self.product_id = product_id
         self.symbol = symbol
+        self.fsp = fsp
+        self.clearing = (
+            clearing if clearing is not None else afp.bindings.ClearingDiamond(w3)
+        )
+
+    @cached_property
+    def product_id_hex(self) -> str:
+        """The 0x-prefixed hex representation of the product identifier."""
+        return self.product_id.to_0x_hex()
 
     def populate(self) -> None:
         """
         Populates the accounts that have open interest in this product.
 
-        Queries all accounts with open interest, checks their position quantities,
-        and ensures the total quantity is zero before allowing closeout.
+        Queries all accounts with open interest, checks their position quantities
+        in batched RPC requests against a single block, and ensures the total
+        quantity is zero before allowing closeout.
 
         Raises
         ------
@@ -62,28 +88,38 @@ class ClosingProductContext:
             If the total quantity is not zero, closeout cannot proceed.
         """
         """Populate the accounts that have open interest in this product."""
-        self.accounts = self.client.accounts_in_product(self.product_id.to_0x_hex())
+        self.accounts = self.client.accounts_in_product(self.product_id_hex)
         total_quantity = 0
         if len(self.accounts) == 0:
-            logger.warning("%s - no accounts with open interest", self.product_id.hex())
+            logger.warning("%s - no accounts with open interest", self.product_id_hex)
             return
-        margin_account = afp.bindings.MarginAccount(
-            self.w3, self.accounts[0].margin_account_address
+        margin_account = self.w3.eth.contract(
+            address=self.accounts[0].margin_account_address,
+            abi=afp.bindings.margin_account.ABI,
+        )
+        # Read every quantity at the same block, so that the zero-sum check below
+        # holds even when the reads are split across several batch requests.
+        balances = batch_call(
+            self.w3,
+            [
+                margin_account.functions.positionQuantity(info.account, self.product_id)
+                for info in self.accounts
+            ],
+            block_identifier=self.w3.eth.block_number,
         )
 
         accounts = []
-        for info in self.accounts:
-            balance = margin_account.position_quantity(info.account, self.product_id)
+        for info, balance in zip(self.accounts, balances, strict=True):
             if balance == 0:
                 logger.info(
                     "%s - account %s has zero position, skipping",
-                    self.product_id.hex(),
+                    self.product_id_hex,
                     info.account,
                 )
                 continue
             logger.info(
                 "%s - account %s has position %d",
-                self.product_id.hex(),
+                self.product_id_hex,
                 info.account,
                 balance,
             )
@@ -93,20 +129,27 @@ class ClosingProductContext:
         if total_quantity != 0:
             logger.error(
                 "%s - total quantity is not zero (%d), cannot close out",
-                self.product_id.hex(),
+                self.product_id_hex,
                 total_quantity,
             )
             raise RuntimeError("Total quantity is not zero, cannot close out")
         else:
             logger.info(
-                "%s - total quantity is zero, ready to close out", self.product_id.hex()
+                "%s - total quantity is zero, ready to close out", self.product_id_hex
             )
             self.accounts = accounts
 
-    def start_closeout(self) -> HexBytes:
+    def start_closeout(self, nonce: Optional[int] = None) -> HexBytes:
         """
         Initiates the final settlement (closeout) for the product.
 
+        Parameters
+        ----------
+        nonce : int, optional
+            Nonce to send the transaction with. Callers submitting several
+            transactions before waiting for receipts should assign nonces
+            themselves, otherwise the node's pending nonce is used.
+
         Raises
         ------
         RuntimeError
@@ -118,14 +161,16 @@ class ClosingProductContext:
             The transaction hash of the closeout operation.
         """
         if len(self.accounts) == 0:
-            logger.info("%s - no accounts to close out", self.product_id.hex())
+            logger.info("%s - no accounts to close out", self.product_id_hex)
             raise RuntimeError("No accounts to close out")
-        clearing = afp.bindings.ClearingDiamond(self.w3)
-        fn = clearing.initiate_final_settlement(
+        fn = self.clearing.initiate_final_settlement(
             self.product_id,
             [info.account for info in self.accounts],
         )
-        return fn.transact()
+        tx_params: TxParams = {}
+        if nonce is not None:
+            tx_params["nonce"] = Nonce(nonce)
+        return fn.transact(tx_params)
 
 
 class CloseoutService:
@@ -143,14 +188,39 @@ class CloseoutService:
         Subquery client for querying product/account data.
     w3 : Web3
         Web3 instance for contract interactions.
+    clearing_address : ChecksumAddress
+        Address of the ClearingDiamond contract.
+    clearing : afp.bindings.ClearingDiamond
+        ClearingDiamond binding, shared with the product contexts.
     """
 
     client: AutSubquery
     w3: Web3
+    clearing_address: ChecksumAddress
 
-    def __init__(self, w3: Web3, client: AutSubquery):
+    def __init__(
+        self,
+        w3: Web3,
+        client: AutSubquery,
+        clearing_address: ChecksumAddress = defaults.CLEARING_DIAMOND_ADDRESS,
+    ):
         self.client = client
         self.w3 = w3
+        self.clearing_address = clearing_address
+
+    @cached_property
+    def clearing(self) -> afp.bindings.ClearingDiamond:
+        """The ClearingDiamond binding, constructed once per service."""
+        return afp.bindings.ClearingDiamond(self.w3, self.clearing_address)
+
+    @cached_property
+    def clearing_contract(self) -> Contract:
+        """The raw ClearingDiamond contract at the same address, used to batch
+        read-only calls."""
+        return self.w3.eth.contract(
+            address=self.clearing_address,
+            abi=afp.bindings.facade.CLEARING_DIAMOND_ABI,
+        )
 
     def closeable_products(self) -> List[ClosingProductContext]:
         """
@@ -159,17 +229,22 @@ class CloseoutService:
         For each product, checks if the tradeout interval has passed, open interest is positive,
         and the FSP (Final Settlement Price) has been submitted and finalized.
 
+        The on-chain checks are sent as batched RPC requests against a single block,
+        rather than as separate requests per product.
+
         Returns
         -------
         List[ClosingProductContext]
             List of contexts for each closeable product found.
         """
-        now = self.w3.eth.get_block("latest")["timestamp"]
+        block = self.w3.eth.get_block("latest")
+        now = block["timestamp"]
+        # Always present on a mined block, but BlockData declares every key optional.
+        block_number = block["number"]  # pyright: ignore[reportTypedDictNotRequiredAccess]
         logger.info("scanning products with Earliest FSP Submission before %d", now)
         products = self.client.products_with_fsp_passed(now)
-        clearing = afp.bindings.ClearingDiamond(self.w3)
 
-        closeable_products = []
+        candidates: list[tuple[ProductInfo, HexBytes]] = []
         for product in products:
             if (
                 not product.earliest_fsp_submission_time + product.tradeout_interval
@@ -180,17 +255,50 @@ class CloseoutService:
                     product.name,
                 )
                 continue
-            if not clearing.open_interest(HexBytes(product.id)) > 0:
+            candidates.append((product, HexBytes(product.id)))
+
+        contract = self.clearing_contract
+        results = batch_call(
+            self.w3,
+            [
+                fn
+                for _, product_id in candidates
+                for fn in (
+                    contract.functions.openInterest(product_id),
+                    contract.functions.getFsp(product_id),
+                )
+            ],
+            block_identifier=block_number,
+        )
+
+        finalized_products: list[tuple[ProductInfo, HexBytes, int]] = []
+        for (product, product_id), open_interest, (fsp, finalized) in zip(
+            candidates, results[0::2], results[1::2], strict=True
+        ):
+            if not open_interest > 0:
                 logger.info("%s - no open interest, cannot close out", product.name)
                 continue
-            (fsp, finalized) = clearing.get_fsp(HexBytes(product.id))
             if not finalized:
                 logger.info("%s - FSP not submitted, cannot close out", product.name)
                 continue
             if fsp == 0:
                 logger.info("%s - FSP zero, cannot close out", product.name)
                 continue
-            finalized_time = clearing.get_fsp_finalization_time(HexBytes(product.id))
+            finalized_products.append((product, product_id, fsp))
+
+        finalized_times = batch_call(
+            self.w3,
+            [
+                contract.functions.getFspFinalizationTime(product_id)
+                for _, product_id, _ in finalized_products
+            ],
+            block_identifier=block_number,
+        )
+
+        closeable_products: List[ClosingProductContext] = []
+        for (product, product_id, fsp), finalized_time in zip(
+            finalized_products, finalized_times, strict=True
+        ):
             if finalized_time + product.tradeout_interval > now:
                 logger.info(
                     "%s - tradeout interval after FSP finalization not passed, cannot close out",
@@ -200,7 +308,7 @@ class CloseoutService:
             logger.info("%s - product is closeable with fsp = %d", product.name, fsp)
             closeable_products.append(
                 ClosingProductContext(
-                    self.w3, self.client, HexBytes(product.id), product.name
+                    self.w3, self.client, product_id, product.name, fsp, self.clearing
                 )
             )
 
@@ -220,5 +328,4 @@ class CloseoutService:
         int
             The open interest for the product.
         """
-        clearing = afp.bindings.ClearingDiamond(self.w3)
-        return clearing.open_interest(product_id)
+        return self.clearing.open_interest(product_id)
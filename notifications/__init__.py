@@ -1,7 +1,7 @@
 import abc
 import logging
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +45,7 @@ class DefaultNotifier(Notifier):
         self,
         title: str,
         content: str,
-        table: Optional[List[Dict[str, Any]]] = None,
+        items: Optional[List[NotificationItem]] = None,
     ) -> None:
         # Discard the notification
         pass
@@ -94,13 +94,14 @@ class SlackBotNotifier(Notifier):
 
         if items:
             # Format as a bulleted list: each entry bolded, then indented bullets for fields
-            list_md = ""
+            parts: List[str] = []
             for item in items:
                 # Use the first key as the "main" label (e.g., Account)
-                list_md += f"*{item.title}*\n"
+                parts.append(f"*{item.title}*\n")
                 for k, value in item.values.items():
-                    list_md += f"- *{k}:* {value}\n"
-                list_md += "\n"
+                    parts.append(f"- *{k}:* {value}\n")
+                parts.append("\n")
+            list_md = "".join(parts)
             blocks.append(
                 {"type": "section", "text": {"type": "mrkdwn", "text": list_md.strip()}}
             )
@@ -114,9 +115,9 @@ class SlackBotNotifier(Notifier):
             }
             self.client.chat_postMessage(**kwargs)
         except SlackApiError as e:
-            logger.error(f"Failed to send Slack notification: {e.response['error']}")
+            logger.error("Failed to send Slack notification: %s", e.response["error"])
         except Exception as e:
-            logger.error(f"Failed to send Slack notification: {e}")
+            logger.error("Failed to send Slack notification: %s", e)
 
 
 def get_notifier() -> Notifier:
@@ -14,6 +14,6 @@ def ping_healthcheck():
             urllib.request.urlopen(HEALTHCHECK_PING_URL, timeout=10)
         except socket.error as e:
             # Log ping failure here...
-            logger.error(f"Healthcheck ping failed: {e}")
+            logger.error("Healthcheck ping failed: %s", e)
     else:
         logger.warning("HEALTHCHECK_PING_URL not set; skipping healthcheck ping.")
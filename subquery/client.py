@@ -1,9 +1,10 @@
 import logging
-from typing import List, Optional
+from typing import Any, List, Optional, cast
 
 from gql import Client
-from gql.transport.aiohttp import AIOHTTPTransport
-from gql.transport.aiohttp import log as requests_logger
+from gql.client import SyncClientSession
+from gql.transport.requests import RequestsHTTPTransport
+from gql.transport.requests import log as requests_logger
 
 from .model import AccountInfo, ProductInfo
 from .query import (
@@ -13,14 +14,40 @@ from .query import (
 
 requests_logger.setLevel(logging.ERROR)  # Suppress requests logging for cleaner output
 
+# Number of nodes requested per page. Pages are chained by cursor, so each page
+# is a separate round-trip; 100 is the default query limit of SubQuery nodes.
+PAGE_SIZE = 100
+
 
 class AutSubquery:
     def __init__(self, url: str):
         """Initializes the AutSubquery with a GraphQL endpoint."""
-        self.transport = AIOHTTPTransport(url=url, ssl=True)
-        self.client = Client(transport=self.transport, fetch_schema_from_transport=True)
-
-    def accounts_in_product(self, product_id: str) -> List[AccountInfo]:
+        # Unlike the async transports, gql applies no execute_timeout to sync
+        # transports, so bound each request here to keep a stalled endpoint from
+        # hanging the agent.
+        self.transport = RequestsHTTPTransport(url=url, verify=True, timeout=10)
+        # Skip the schema introspection query: queries are not validated client-side
+        # and the introspection result is large compared to the data being fetched.
+        self.client = Client(
+            transport=self.transport, fetch_schema_from_transport=False
+        )
+        # Keep one session open for all queries so that the HTTP connection is
+        # reused instead of doing a new TCP and TLS handshake per page.
+        self.session = cast(SyncClientSession, self.client.connect_sync())
+
+    def close(self) -> None:
+        """Closes the session and the underlying HTTP connection."""
+        self.client.close_sync()
+
+    def __enter__(self) -> "AutSubquery":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def accounts_in_product(
+        self, product_id: str, page_size: int = PAGE_SIZE
+    ) -> List[AccountInfo]:
         """Retrieve all AccountInfo entries for a product using cursor pagination.
 
         Pagination details:
@@ -35,20 +62,28 @@ class AutSubquery:
         ----------
         product_id : str
             The product id to fetch holdings for.
+        page_size : int
+            The number of nodes to request per page.
 
         Returns
         -------
         list[AccountInfo]
             A combined list of AccountInfo objects for all pages.
+
+        Raises
+        ------
+        ValueError
+            If `page_size` is less than 1.
         """
+        if page_size < 1:
+            raise ValueError(f"page_size must be at least 1, got {page_size}")
         query, parser = accounts_in_product_query()
         results: List[AccountInfo] = []
         after: Optional[str] = None
-        page_size = 50
 
         while True:
             variables = {"productId": product_id, "first": page_size, "after": after}
-            resp = self.client.execute(query, variable_values=variables)
+            resp = self.session.execute(query, variable_values=variables)
             results.extend(parser(resp))
 
             page_info = resp["productHoldings"].get("pageInfo", {})
@@ -58,27 +93,37 @@ class AutSubquery:
 
         return results
 
-    def products_with_fsp_passed(self, current_timestamp: int) -> List[ProductInfo]:
+    def products_with_fsp_passed(
+        self, current_timestamp: int, page_size: int = PAGE_SIZE
+    ) -> List[ProductInfo]:
         """Retrieves all products whose FSP submission time has passed
 
         Parameters
         ----------
         current_timestamp : int
             The current timestamp to compare against earliestFSPSubmissionTime.
+        page_size : int
+            The number of nodes to request per page.
 
         Returns
         -------
         list[ProductInfo]
             A combined list of ProductInfo objects for all pages.
+
+        Raises
+        ------
+        ValueError
+            If `page_size` is less than 1.
         """
+        if page_size < 1:
+            raise ValueError(f"page_size must be at least 1, got {page_size}")
         query, parser = products_with_fsp_passed_query()
         results: List[ProductInfo] = []
         after: Optional[str] = None
-        page_size = 50
 
         while True:
             variables = {"currentTimestamp": str(current_timestamp), "first": page_size, "after": after}
-            resp = self.client.execute(query, variable_values=variables)
+            resp = self.session.execute(query, variable_values=variables)
             results.extend(parser(resp))
 
             page_info = resp["products"].get("pageInfo", {})
@@ -2,14 +2,14 @@ from dataclasses import dataclass
 from eth_typing import ChecksumAddress
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AccountInfo:
     account: ChecksumAddress
     margin_account_address: ChecksumAddress
     quantity: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ProductInfo:
     id: str
     name: str
@@ -6,90 +6,91 @@ from graphql import DocumentNode
 
 from .model import AccountInfo, ProductInfo
 
+# Parsed once at import; the queries take all their inputs as variables.
+_ACCOUNTS_IN_PRODUCT_QUERY = gql(
+    """
+    query($productId: String!, $first: Int!, $after: Cursor) {
+      productHoldings(
+        filter: {productId: {equalTo: $productId}, quantity: {notEqualTo: "0"}}
+        first: $first
+        after: $after
+      ) {
+        nodes {
+          productId
+          marginAccountHolding {
+            marginAccount {
+                contractAddress
+            }
+            owner
+          }
+          quantity
+        }
+        pageInfo {
+          hasNextPage
+          endCursor
+        }
+      }
+    }
+    """
+)
 
-def accounts_in_product_query() -> (DocumentNode, Callable[[Dict[str, Any]], List[AccountInfo]]):
-    query = gql(
-        """
-        query($productId: String!, $first: Int!, $after: Cursor) {
-          productHoldings(
-            filter: {productId: {equalTo: $productId}, quantity: {notEqualTo: "0"}}
+_PRODUCTS_WITH_FSP_PASSED_QUERY = gql("""
+    query($currentTimestamp: BigFloat!, $first: Int!, $after: Cursor) {
+        products(
+            filter: {earliestFSPSubmissionTime: {lessThan: $currentTimestamp}}
             first: $first
             after: $after
-          ) {
+        ) {
             nodes {
-              productId
-              marginAccountHolding {
-                marginAccount {
-                    contractAddress
+                id
+                symbol
+                state
+                earliestFSPSubmissionTime
+                tradeoutInterval
+                fsp {
+                    fsp
+                    blockNumber
                 }
-                owner
-              }
-              quantity
             }
             pageInfo {
-              hasNextPage
-              endCursor
+                hasNextPage
+                endCursor
             }
-          }
         }
-        """
-    )
+    }
+    """)
 
-    def parser(result: Dict[str, Any]) -> List[AccountInfo]:
-        accounts: List[AccountInfo] = []
-        for holding in result["productHoldings"]["nodes"]:
-            accounts.append(
-                AccountInfo(
-                    account=ChecksumAddress(holding["marginAccountHolding"]["owner"]),
-                    margin_account_address=ChecksumAddress(
-                        holding["marginAccountHolding"]["marginAccount"]["contractAddress"]
-                    ),
-                    quantity=int(holding["quantity"]),
-                )
-            )
-        return accounts
 
-    return query, parser
+def _parse_accounts_in_product(result: Dict[str, Any]) -> List[AccountInfo]:
+    return [
+        AccountInfo(
+            account=ChecksumAddress(holding["marginAccountHolding"]["owner"]),
+            margin_account_address=ChecksumAddress(
+                holding["marginAccountHolding"]["marginAccount"]["contractAddress"]
+            ),
+            quantity=int(holding["quantity"]),
+        )
+        for holding in result["productHoldings"]["nodes"]
+    ]
 
 
-def products_with_fsp_passed_query() -> (DocumentNode, Callable[[Dict[str, any]], List[ProductInfo]]):
-    query = gql("""
-        query($currentTimestamp: BigFloat!, $first: Int!, $after: Cursor) {
-            products(
-                filter: {earliestFSPSubmissionTime: {lessThan: $currentTimestamp}}
-                first: $first
-                after: $after
-            ) {
-                nodes {
-                    id
-                    symbol
-                    state
-                    earliestFSPSubmissionTime
-                    tradeoutInterval
-                    fsp {
-                        fsp
-                        blockNumber
-                    }
-                }
-                pageInfo {
-                    hasNextPage
-                    endCursor
-                }
-            }
-        }
-        """)
+def _parse_products_with_fsp_passed(result: Dict[str, Any]) -> List[ProductInfo]:
+    return [
+        ProductInfo(
+            id=product["id"],
+            name=product["symbol"],
+            state=product["state"],
+            earliest_fsp_submission_time=int(product["earliestFSPSubmissionTime"]),
+            tradeout_interval=int(product["tradeoutInterval"]),
+            fsp=int(product["fsp"]["fsp"] if product["fsp"] else 0),
+        )
+        for product in result["products"]["nodes"]
+    ]
 
-    def parser(result: Dict[str, Any]) -> List[ProductInfo]:
-        return [
-            ProductInfo(
-                id=product["id"],
-                name=product["symbol"],
-                state=product["state"],
-                earliest_fsp_submission_time=int(product["earliestFSPSubmissionTime"]),
-                tradeout_interval=int(product["tradeoutInterval"]),
-                fsp=int(product["fsp"]["fsp"] if product["fsp"] else 0),
-            )
-            for product in result["products"]["nodes"]
-        ]
 
-    return query, parser
+def accounts_in_product_query() -> (DocumentNode, Callable[[Dict[str, Any]], List[AccountInfo]]):
+    return _ACCOUNTS_IN_PRODUCT_QUERY, _parse_accounts_in_product
+
+
+def products_with_fsp_passed_query() -> (DocumentNode, Callable[[Dict[str, any]], List[ProductInfo]]):
+    return _PRODUCTS_WITH_FSP_PASSED_QUERY, _parse_products_with_fsp_passed
@@ -0,0 +1,141 @@
+import importlib
+from types import ModuleType
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+from hexbytes import HexBytes
+
+NONCE = 7
+
+
+@pytest.fixture
+def closeout_main(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    # The module reads its configuration from the environment when imported.
+    monkeypatch.setenv("PRIVATE_KEY", "0x" + "11" * 32)
+    monkeypatch.setenv("RPC_URL", "http://localhost:8545")
+    monkeypatch.setenv("SUBQUERY_URL", "http://localhost:3000")
+    return importlib.import_module("closeout.__main__")
+
+
+def context(i: int) -> mock.MagicMock:
+    product = mock.MagicMock()
+    product.product_id = HexBytes(bytes([i]) * 32)
+    product.product_id_hex = product.product_id.to_0x_hex()
+    product.symbol = f"P{i}"
+    product.fsp = 42
+    product.accounts = [mock.sentinel.account]
+    product.start_closeout.return_value = HexBytes(bytes([i]) * 32)
+    return product
+
+
+def run_main(
+    module: ModuleType, products: List[mock.MagicMock], w3: mock.MagicMock
+) -> Dict[str, Any]:
+    w3.eth.get_transaction_count.return_value = NONCE
+    w3.eth.wait_for_transaction_receipt.return_value.blockNumber = 16
+    service = mock.MagicMock()
+    service.closeable_products.return_value = products
+    service.open_interest.return_value = 0
+    notifier = mock.MagicMock()
+    with (
+        mock.patch.object(module, "Web3", return_value=w3),
+        mock.patch.object(module, "AutSubquery"),
+        mock.patch.object(module, "CloseoutService", return_value=service),
+        mock.patch.object(module, "notifier", notifier),
+        mock.patch.object(module, "ping_healthcheck") as ping_healthcheck,
+    ):
+        error = None
+        try:
+            module.main()
+        except Exception as e:
+            error = e
+    return {
+        "error": error,
+        "service": service,
+        "notifier": notifier,
+        "ping_healthcheck": ping_healthcheck,
+    }
+
+
+def notified_symbols(notifier: mock.MagicMock) -> List[str]:
+    notifier.notify.assert_called_once()
+    return [item.title for item in notifier.notify.call_args.args[2]]
+
+
+def test_main_assigns_consecutive_nonces(closeout_main: ModuleType):
+    products = [context(1), context(2), context(3)]
+
+    result = run_main(closeout_main, products, mock.MagicMock())
+
+    assert [p.start_closeout.call_args.args for p in products] == [
+        (NONCE,),
+        (NONCE + 1,),
+        (NONCE + 2,),
+    ]
+    assert result["error"] is None
+    assert notified_symbols(result["notifier"]) == [
+        "Product P1",
+        "Product P2",
+        "Product P3",
+    ]
+    result["ping_healthcheck"].assert_called_once()
+
+
+def test_main_skips_product_that_fails_to_send(closeout_main: ModuleType):
+    products = [context(1), context(2), context(3)]
+    failure = RuntimeError("closeout reverted")
+    products[1].start_closeout.side_effect = failure
+
+    result = run_main(closeout_main, products, mock.MagicMock())
+
+    # The failed send does not use up a nonce.
+    products[0].start_closeout.assert_called_once_with(NONCE)
+    products[2].start_closeout.assert_called_once_with(NONCE + 1)
+    assert notified_symbols(result["notifier"]) == ["Product P1", "Product P3"]
+    assert result["error"] is failure
+    result["ping_healthcheck"].assert_not_called()
+
+
+def test_main_skips_product_that_fails_to_populate(closeout_main: ModuleType):
+    products = [context(1), context(2)]
+    failure = RuntimeError("Total quantity is not zero, cannot close out")
+    products[0].populate.side_effect = failure
+
+    result = run_main(closeout_main, products, mock.MagicMock())
+
+    products[0].start_closeout.assert_not_called()
+    products[1].start_closeout.assert_called_once_with(NONCE)
+    assert notified_symbols(result["notifier"]) == ["Product P2"]
+    assert result["error"] is failure
+    result["ping_healthcheck"].assert_not_called()
+
+
+def test_main_checks_remaining_receipts_after_a_failure(closeout_main: ModuleType):
+    products = [context(1), context(2)]
+    failure = TimeoutError("receipt not found")
+    w3 = mock.MagicMock()
+    receipt = mock.MagicMock(blockNumber=16)
+    w3.eth.wait_for_transaction_receipt.side_effect = [failure, receipt]
+
+    result = run_main(closeout_main, products, w3)
+
+    result["service"].open_interest.assert_called_once_with(products[1].product_id)
+    # Both transactions were broadcast, so both are notified.
+    assert notified_symbols(result["notifier"]) == ["Product P1", "Product P2"]
+    assert result["error"] is failure
+    result["ping_healthcheck"].assert_not_called()
+
+
+def test_main_raises_the_first_error(closeout_main: ModuleType):
+    products = [context(1), context(2), context(3)]
+    first = RuntimeError("Total quantity is not zero, cannot close out")
+    second = RuntimeError("closeout reverted")
+    products[0].populate.side_effect = first
+    products[1].start_closeout.side_effect = second
+
+    result = run_main(closeout_main, products, mock.MagicMock())
+
+    products[2].start_closeout.assert_called_once_with(NONCE)
+    assert notified_symbols(result["notifier"]) == ["Product P3"]
+    assert result["error"] is first
@@ -0,0 +1,164 @@
+from typing import Any, Dict, List, Sequence, Tuple
+from unittest import mock
+
+import pytest
+from hexbytes import HexBytes
+from web3 import Web3
+
+from closeout.service import CloseoutService, ClosingProductContext
+from subquery.client import AutSubquery
+from subquery.model import AccountInfo, ProductInfo
+
+NOW = 1_000_000
+BLOCK_NUMBER = 16
+TRADEOUT_INTERVAL = 600
+
+# product id byte -> (open interest, fsp, finalized, fsp finalization time)
+CHAIN_STATE: Dict[int, Tuple[int, int, bool, int]] = {
+    1: (100, 42, True, 0),  # closeable
+    2: (0, 42, True, 0),  # no open interest
+    3: (100, 0, False, 0),  # FSP not finalized
+    4: (100, 0, True, 0),  # FSP zero
+    5: (100, 42, True, NOW),  # tradeout after finalization not passed
+    6: (100, 7, True, 0),  # closeable
+}
+
+
+def product_id(i: int) -> str:
+    return HexBytes(bytes([i]) * 32).to_0x_hex()
+
+
+def product(i: int, earliest_fsp_submission_time: int = 0) -> ProductInfo:
+    return ProductInfo(
+        id=product_id(i),
+        name=f"P{i}",
+        state="",
+        earliest_fsp_submission_time=earliest_fsp_submission_time,
+        tradeout_interval=TRADEOUT_INTERVAL,
+        fsp=0,
+    )
+
+
+def fake_batch_call(
+    w3: Web3, fns: Sequence[Any], block_identifier: Any = "latest", **kwargs: Any
+) -> List[Any]:
+    """Answers each call by function name, independently of its position."""
+    assert block_identifier == BLOCK_NUMBER
+    results: List[Any] = []
+    for fn in fns:
+        open_interest, fsp, finalized, finalized_time = CHAIN_STATE[fn.args[0][-1]]
+        if fn.fn_name == "openInterest":
+            results.append(open_interest)
+        elif fn.fn_name == "getFsp":
+            results.append([fsp, finalized])
+        elif fn.fn_name == "getFspFinalizationTime":
+            results.append(finalized_time)
+        else:
+            raise AssertionError(f"unexpected call {fn.fn_name}")
+    return results
+
+
+def closeable_products(products: List[ProductInfo]):
+    w3 = Web3()
+    client = mock.create_autospec(AutSubquery, instance=True)
+    client.products_with_fsp_passed.return_value = products
+    block = {"number": BLOCK_NUMBER, "timestamp": NOW}
+    with (
+        mock.patch.object(w3.eth, "get_block", return_value=block),
+        mock.patch(
+            "closeout.service.batch_call", side_effect=fake_batch_call
+        ) as batch_call,
+    ):
+        result = CloseoutService(w3, client).closeable_products()
+    client.products_with_fsp_passed.assert_called_once_with(NOW)
+    return result, batch_call
+
+
+def test_closeable_products_filters_on_batched_results():
+    products, _ = closeable_products([product(i) for i in CHAIN_STATE])
+
+    assert [(p.product_id, p.symbol, p.fsp) for p in products] == [
+        (HexBytes(product_id(1)), "P1", 42),
+        (HexBytes(product_id(6)), "P6", 7),
+    ]
+
+
+def test_closeable_products_skips_tradeout_not_passed():
+    products, batch_call = closeable_products(
+        [product(1, earliest_fsp_submission_time=NOW), product(6)]
+    )
+
+    assert [p.symbol for p in products] == ["P6"]
+    queried = {fn.args[0] for call in batch_call.call_args_list for fn in call.args[1]}
+    assert queried == {HexBytes(product_id(6))}
+
+
+def test_closeable_products_without_candidates():
+    products, _ = closeable_products([])
+
+    assert products == []
+
+
+MARGIN_ACCOUNT = Web3.to_checksum_address("0x" + "22" * 20)
+
+
+def account(i: int) -> AccountInfo:
+    return AccountInfo(
+        account=Web3.to_checksum_address("0x" + f"{i:02x}" * 20),
+        margin_account_address=MARGIN_ACCOUNT,
+        quantity=0,
+    )
+
+
+def populate(balances: Dict[int, int]):
+    """Populates a context whose accounts hold the given position quantities."""
+    w3 = Web3()
+    client = mock.create_autospec(AutSubquery, instance=True)
+    client.accounts_in_product.return_value = [account(i) for i in balances]
+    context = ClosingProductContext(
+        w3, client, HexBytes(product_id(1)), "P1", 42, mock.Mock()
+    )
+
+    def fake_batch_call(
+        w3: Web3, fns: Sequence[Any], block_identifier: Any = "latest", **kwargs: Any
+    ) -> List[Any]:
+        assert block_identifier == BLOCK_NUMBER
+        assert all(fn.fn_name == "positionQuantity" for fn in fns)
+        assert all(fn.args[1] == context.product_id for fn in fns)
+        return [balances[int(fn.args[0][-2:], 16)] for fn in fns]
+
+    with (
+        mock.patch.object(
+            type(w3.eth),
+            "block_number",
+            new_callable=mock.PropertyMock,
+            return_value=BLOCK_NUMBER,
+        ),
+        mock.patch(
+            "closeout.service.batch_call", side_effect=fake_batch_call
+        ) as batch_call,
+    ):
+        context.populate()
+    client.accounts_in_product.assert_called_once_with(product_id(1))
+    return context, batch_call
+
+
+def test_populate_drops_zero_balances():
+    context, batch_call = populate({1: 5, 2: 0, 3: -5, 4: 0})
+
+    assert context.accounts == [account(1), account(3)]
+    # All quantities are read in one call at a single block.
+    batch_call.assert_called_once()
+    assert len(batch_call.call_args.args[1]) == 4
+
+
+def test_populate_rejects_non_zero_total():
+    with pytest.raises(RuntimeError, match="Total quantity is not zero"):
+        populate({1: 5, 2: -3})
+
+
+def test_populate_without_holdings():
+    context, batch_call = populate({})
+
+    assert context.accounts == []
+    batch_call.assert_not_called()
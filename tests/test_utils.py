@@ -0,0 +1,139 @@
+import importlib
+from typing import Any, Dict, List, Sequence, Tuple
+from unittest import mock
+
+import pytest
+from eth_abi.abi import encode
+from web3 import Web3
+from web3.providers import JSONBaseProvider
+
+import utils
+from utils import batch_call, wait_for_blocks
+
+ABI = [
+    {
+        "type": "function",
+        "name": "value",
+        "stateMutability": "view",
+        "inputs": [{"name": "i", "type": "uint256"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    }
+]
+ADDRESS = Web3.to_checksum_address("0x" + "11" * 20)
+
+
+class BatchProvider(JSONBaseProvider):
+    """Answers batched `value(i)` calls with `i * 10` and records batch sizes."""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes: List[int] = []
+
+    def make_request(self, method: Any, params: Any) -> Any:
+        raise AssertionError(f"unexpected single request {method}")
+
+    def make_batch_request(self, requests: List[Tuple[Any, Any]]) -> Any:
+        self.batch_sizes.append(len(requests))
+        responses: List[Dict[str, Any]] = []
+        for request_id, (method, params) in enumerate(requests):
+            assert method == "eth_call"
+            arg = int(params[0]["data"][10:], 16)
+            result = encode(["uint256"], [arg * 10])
+            responses.append(
+                {"jsonrpc": "2.0", "id": request_id, "result": "0x" + result.hex()}
+            )
+        return responses
+
+
+def make_calls(n: int):
+    provider = BatchProvider()
+    w3 = Web3(provider)
+    contract = w3.eth.contract(address=ADDRESS, abi=ABI)
+    return w3, provider, [contract.functions.value(i) for i in range(n)]
+
+
+@pytest.mark.parametrize(
+    "n, batch_size, expected_batches",
+    [
+        (3, 5, [3]),
+        (5, 5, [5]),
+        (7, 5, [5, 2]),
+        (10, 5, [5, 5]),
+        (3, 1, [1, 1, 1]),
+    ],
+)
+def test_batch_call_chunks(n: int, batch_size: int, expected_batches: List[int]):
+    w3, provider, fns = make_calls(n)
+
+    results = batch_call(w3, fns, batch_size=batch_size)
+
+    assert results == [i * 10 for i in range(n)]
+    assert provider.batch_sizes == expected_batches
+
+
+def test_batch_call_empty():
+    w3, provider, _ = make_calls(0)
+
+    assert batch_call(w3, [], batch_size=5) == []
+    assert provider.batch_sizes == []
+
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+def test_batch_call_rejects_invalid_batch_size(batch_size: int):
+    w3, provider, fns = make_calls(3)
+
+    with pytest.raises(ValueError):
+        batch_call(w3, fns, batch_size=batch_size)
+    assert provider.batch_sizes == []
+
+
+def wait(
+    block_numbers: Sequence[Any], num_blocks: int = 1, **kwargs: Any
+) -> List[float]:
+    """Waits for `num_blocks` blocks while the node reports `block_numbers`, and
+    returns the sleep intervals."""
+    w3 = mock.MagicMock()
+    type(w3.eth).block_number = mock.PropertyMock(side_effect=block_numbers)
+    with mock.patch("utils.time.sleep") as sleep:
+        wait_for_blocks(w3, num_blocks, **kwargs)
+    return [call.args[0] for call in sleep.call_args_list]
+
+
+def test_wait_for_blocks_backs_off():
+    assert wait([0, 0, 0, 0, 0, 0, 1]) == [1, 2, 4, 8, 8]
+
+
+def test_wait_for_blocks_resets_interval_when_chain_advances():
+    assert wait([0, 0, 0, 0, 1, 1, 2], num_blocks=2) == [1, 2, 4, 1, 2]
+
+
+def test_wait_for_blocks_backs_off_on_errors():
+    assert wait([0, ValueError("rpc"), ValueError("rpc"), 1]) == [1, 2]
+
+
+def test_wait_for_blocks_never_polls_faster_than_poll_interval():
+    assert wait([0, 0, 0, 1], poll_interval=10, max_poll_interval=8) == [10, 10]
+
+
+@pytest.fixture
+def reload_utils(monkeypatch: pytest.MonkeyPatch):
+    """Reloads `utils` with BATCH_SIZE set, restoring the module afterwards."""
+
+    def reload(batch_size: str):
+        monkeypatch.setenv("BATCH_SIZE", batch_size)
+        return importlib.reload(utils)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(utils)
+
+
+@pytest.mark.parametrize("batch_size, expected", [("", 100), (" ", 100), ("25", 25)])
+def test_batch_size_from_env(reload_utils: Any, batch_size: str, expected: int):
+    assert reload_utils(batch_size).BATCH_SIZE == expected
+
+
+@pytest.mark.parametrize("batch_size", ["0", "-1", "ten"])
+def test_batch_size_from_env_rejects_invalid_values(reload_utils: Any, batch_size: str):
+    with pytest.raises(ValueError, match="BATCH_SIZE"):
+        reload_utils(batch_size)
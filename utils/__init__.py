@@ -1,14 +1,45 @@
-from decimal import Decimal
+import logging
+import os
 import time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Sequence
+
 from web3 import Web3
+from web3.contract.contract import ContractFunction
+from web3.types import BlockIdentifier
+
+logger = logging.getLogger(__name__)
+
+
+def _batch_size_from_env() -> int:
+    value = os.getenv("BATCH_SIZE", "").strip() or "100"
+    try:
+        batch_size = int(value)
+    except ValueError:
+        raise ValueError(f"BATCH_SIZE must be an integer, got {value!r}") from None
+    if batch_size < 1:
+        raise ValueError(f"BATCH_SIZE must be at least 1, got {batch_size}")
+    return batch_size
 
 
-def parse_decimal(d: Decimal | str, decimals: int) -> int:
+# Maximum number of calls sent in a single JSON-RPC batch request; nodes reject
+# batches above their configured limit. Validated here so that a bad value fails
+# at startup rather than after the Subquery scan.
+BATCH_SIZE = _batch_size_from_env()
+
+
+@lru_cache(maxsize=None)
+def _pow10(decimals: int) -> Decimal:
+    return Decimal(10**decimals)
+
+
+def parse_decimal(d: Decimal | str | int, decimals: int) -> int:
     """Converts a Decimal or string representation of a number to an integer based on the specified decimal places.
 
     Parameters
     ----------
-    d : decimal.Decimal | str
+    d : decimal.Decimal | str | int
         The number to be converted.
     decimals : int
         The number of decimal places to consider.
@@ -18,8 +49,10 @@ def parse_decimal(d: Decimal | str, decimals: int) -> int:
     int
         The integer representation of the number.
     """
-    d = Decimal(d)
-    return int(d * Decimal(10**decimals))
+    if isinstance(d, int) and decimals >= 0:
+        return d * 10**decimals
+    # Shift the exponent instead of building Decimal(10**decimals) to multiply by.
+    return int(Decimal(d).scaleb(decimals))
 
 
 def format_int(i: int, decimals: int) -> Decimal:
@@ -37,19 +70,75 @@ def format_int(i: int, decimals: int) -> Decimal:
     decimal.Decimal
         The Decimal representation of the integer.
     """
-    return Decimal(i) / Decimal(10**decimals)
+    return Decimal(i) / _pow10(decimals)
+
 
+def wait_for_blocks(
+    w3: Web3, num_blocks: int, poll_interval: float = 1, max_poll_interval: float = 8
+) -> None:
+    """Waits for a specified number of blocks.
 
-def wait_for_blocks(w3: Web3, num_blocks: int, poll_interval: int = 1) -> None:
-    """Waits for a specified number of blocks."""
-    start_block = w3.eth.get_block("latest")["number"]
+    The poll interval doubles, up to `max_poll_interval`, while no new block is
+    seen or the block number cannot be read, and is reset to `poll_interval`
+    whenever the chain advances. It never drops below `poll_interval`, even if
+    that is larger than `max_poll_interval`.
+    """
+    start_block = w3.eth.block_number
     target_block = start_block + num_blocks
+    last_block = start_block
+    interval = poll_interval
     while True:
         try:
-            current_block = w3.eth.get_block("latest")["number"]
+            current_block = w3.eth.block_number
             if current_block >= target_block:
                 break
-            time.sleep(poll_interval)
+            if current_block > last_block:
+                last_block = current_block
+                interval = poll_interval
         except Exception as e:
-            print(f"Error while waiting for blocks: {e}")
-            time.sleep(poll_interval)
+            logger.warning("Error while waiting for blocks: %s", e)
+        time.sleep(interval)
+        interval = max(poll_interval, min(interval * 2, max_poll_interval))
+
+
+def batch_call(
+    w3: Web3,
+    fns: Sequence[ContractFunction],
+    block_identifier: BlockIdentifier = "latest",
+    batch_size: int = BATCH_SIZE,
+) -> List[Any]:
+    """Executes read-only contract calls using JSON-RPC batch requests.
+
+    The calls are sent in chunks of at most `batch_size` requests, so N calls
+    take ceil(N / batch_size) round-trips instead of N.
+
+    Parameters
+    ----------
+    w3 : Web3
+        Web3 instance used to send the batch requests.
+    fns : Sequence[ContractFunction]
+        The contract functions to call.
+    block_identifier : BlockIdentifier
+        The block identifier, defaults to the latest block.
+    batch_size : int
+        The maximum number of calls per batch request.
+
+    Returns
+    -------
+    list
+        The decoded return values, in the same order as `fns`.
+
+    Raises
+    ------
+    ValueError
+        If `batch_size` is less than 1.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    results: List[Any] = []
+    for start in range(0, len(fns), batch_size):
+        with w3.batch_requests() as batch:
+            for fn in fns[start : start + batch_size]:
+                batch.add(fn.call(block_identifier=block_identifier))
+            results.extend(batch.execute())
+    return results